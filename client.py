@@ -1,4 +1,5 @@
 from fastmcp import Client
+from fastmcp.client.transports import SSETransport
 import asyncio
 
 async def interact_with_server():
@@ -8,7 +9,10 @@ async def interact_with_server():
     # client = Client("my_server.py")
 
     # Option 2: Connect to a server run via `fastmcp run ... --transport sse --port 8080`
-    client = Client("http://localhost:8000/sse") # Use the correct URL/port
+    # The server pings an idle stream every 15 seconds, so a read timeout
+    # (applied to each read, not to the whole session) of 45 seconds
+    # detects a dead connection after about 3 missed pings.
+    client = Client(SSETransport("http://localhost:8000/sse", sse_read_timeout=45)) # Use the correct URL/port
 
     try:
         async with client:
@@ -34,6 +38,9 @@ async def interact_with_server():
             result = await client.read_resource("opengauss://schemas")
             print(f"\nopengauss://schemas:\n{result[0].text}")
 
+            result = await client.read_resource("opengauss://table_definitions")
+            print(f"\nopengauss://table_definitions:\n{result[0].text}")
+
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
@@ -1,11 +1,25 @@
 import os
+import io
+import re
+import csv
+import asyncio
+import atexit
 import argparse
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import groupby
 import httpx
 from fastmcp import FastMCP
+from starlette.middleware import Middleware
 from dotenv import load_dotenv
 import psycopg2
-from psycopg2 import Error, sql, connect
+from psycopg2 import Error, InterfaceError, OperationalError
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.pool import ThreadedConnectionPool
 
 #log config for this file
 logging.basicConfig(level=logging.INFO)
@@ -15,8 +29,9 @@ logger = logging.getLogger("[OPENGAUSE_MCP]")
 load_dotenv()
 
 # get openGauss connection parameters from env,
-# everytime a resource or tool function called, 
-# this will be used to open a connection.
+# used to open the connections of the pool below.
+# env is read once, later calls return the cached config.
+@lru_cache(maxsize=1)
 def get_db_config():
     """Get database configuration from environment variables."""
     config = {
@@ -30,6 +45,248 @@ def get_db_config():
         raise ValueError("Missing required database configuration")
     return config
 
+# catalog queries, each on a single line so the text sent to openGauss
+# is compact and identical on every call.
+SQL_LIST_SCHEMAS = "SELECT nspname AS schema_name FROM pg_namespace WHERE nspname = ANY($1)"
+SQL_LIST_TABLES = "SELECT schemaname, tablename FROM pg_tables WHERE schemaname = current_schema()"
+SQL_TABLE_DEFINITIONS = ("SELECT table_name, column_name, data_type, column_default, is_nullable, ordinal_position "
+                         "FROM information_schema.columns WHERE table_schema = current_schema() "
+                         "ORDER BY table_name, ordinal_position")
+SQL_TABLE_DEFINITION = ("SELECT column_name, data_type, column_default, is_nullable, ordinal_position "
+                        "FROM information_schema.columns WHERE table_name = $1 AND table_schema = $2")
+SQL_CURRENT_USER_AND_SCHEMA = "SELECT current_user, current_schema"
+# first statement of a transaction reading several catalog queries
+# from one snapshot
+SQL_READ_ONLY_SNAPSHOT = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"
+# undo session state left by execute_query: role, settings
+# (e.g. SET search_path), open WITH HOLD cursors, LISTEN and temp tables,
+# in one round trip, prepared statements are kept
+SQL_RESET_SESSION = "SET SESSION AUTHORIZATION DEFAULT; RESET ALL; CLOSE ALL; UNLISTEN *; DISCARD TEMP"
+
+# the catalog queries are prepared once per pooled connection,
+# so openGauss does not parse and plan them again on every call.
+PREPARED_STATEMENTS = {
+    "og_schemas(text[])": SQL_LIST_SCHEMAS,
+    "og_tables": SQL_LIST_TABLES,
+    "og_table_definitions": SQL_TABLE_DEFINITIONS,
+    "og_table_definition(text, text)": SQL_TABLE_DEFINITION,
+    "og_current_user_and_schema": SQL_CURRENT_USER_AND_SCHEMA,
+}
+
+# statements run by the resource and tool functions
+EXECUTE_LIST_SCHEMAS = "EXECUTE og_schemas(%s)"
+EXECUTE_LIST_TABLES = "EXECUTE og_tables"
+EXECUTE_TABLE_DEFINITIONS = "EXECUTE og_table_definitions"
+EXECUTE_TABLE_DEFINITION = "EXECUTE og_table_definition(%s, %s)"
+EXECUTE_CURRENT_USER_AND_SCHEMA = "EXECUTE og_current_user_and_schema"
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """Connection which prepares PREPARED_STATEMENTS when opened."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepare_statements()
+        # when the connection was last given back to the pool
+        self.last_used = time.monotonic()
+
+    def prepare_statements(self, deallocate=False):
+        """Prepare PREPARED_STATEMENTS, with deallocate drop existing ones first."""
+        with self:
+            with self.cursor() as cursor:
+                if deallocate:
+                    cursor.execute("DEALLOCATE ALL")
+                for name, query in PREPARED_STATEMENTS.items():
+                    cursor.execute(f"PREPARE {name} AS {query}")
+
+# connection pool shared by all resource and tool functions,
+# created on first use so that a missing configuration
+# is reported by the function being called, not at import.
+POOL_MINCONN = 2
+POOL_MAXCONN = 20
+# seconds a pooled connection may sit idle before it is checked on reuse,
+# openGauss closes idle sessions after session_timeout (10 minutes)
+POOL_IDLE_CHECK = 60
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool():
+    """Get the connection pool, create it on first call."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(minconn=POOL_MINCONN, maxconn=POOL_MAXCONN,
+                                               connection_factory=PreparedConnection,
+                                               **get_db_config())
+    return _POOL
+
+def _run_autocommit(conn, query):
+    """
+    Run query outside a transaction, in a single round trip,
+    return False if the connection is unusable.
+    """
+    try:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+        finally:
+            conn.autocommit = False
+        return True
+    except Error:
+        return False
+
+def _getconn(pool):
+    """
+    Get a connection from pool, connections idle longer than
+    POOL_IDLE_CHECK are pinged first and replaced when dead,
+    e.g. after session_timeout or a database restart.
+    """
+    # at most every pooled connection can be stale
+    for _ in range(POOL_MAXCONN):
+        conn = pool.getconn()
+        if not conn.closed and (time.monotonic() - conn.last_used < POOL_IDLE_CHECK
+                                or _run_autocommit(conn, "SELECT 1")):
+            return conn
+        pool.putconn(conn, close=True)
+    return pool.getconn()
+
+@contextmanager
+def get_conn(reset=False):
+    """
+    Borrow a connection from the pool,
+    commit on success, rollback on error, then give it back.
+    With reset, session state changed while borrowed is reset,
+    so they do not leak into later calls using the same connection.
+    """
+    pool = get_pool()
+    conn = _getconn(pool)
+    unprepared = False
+    try:
+        with conn:
+            yield conn
+    except InvalidSqlStatementName:
+        # prepared statements were dropped, e.g. by DEALLOCATE ALL
+        # or DISCARD ALL run through execute_query
+        unprepared = True
+        raise
+    finally:
+        close = bool(conn.closed)
+        if reset and not close:
+            close = not _run_autocommit(conn, SQL_RESET_SESSION)
+        if unprepared and not close:
+            try:
+                conn.prepare_statements(deallocate=True)
+            except Error:
+                close = True
+        conn.last_used = time.monotonic()
+        # a broken connection is dropped instead of being reused
+        pool.putconn(conn, close=close)
+
+def _retry_catalog(func, *args):
+    """
+    Run blocking func(*args) reading the catalog,
+    once more if the connection used failed: it was closed by the server,
+    or its prepared statements were missing, which get_conn prepares
+    again before giving it back. Catalog reads are safe to repeat.
+    """
+    try:
+        return func(*args)
+    except (OperationalError, InterfaceError):
+        return func(*args)
+
+def _fetch_all(query, params=None):
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+# psycopg2 is blocking, so database work is run in a worker thread,
+# keeping the event loop free to serve concurrent requests.
+# There is one worker thread per pooled connection, so a burst of calls
+# runs concurrently up to the pool size (the default executor may have
+# fewer threads on small hosts), the rest queue in the executor
+# instead of failing with "connection pool exhausted".
+_executor = ThreadPoolExecutor(max_workers=POOL_MAXCONN, thread_name_prefix="opengauss")
+
+async def run_in_pool(func, *args):
+    """Run blocking func(*args) in a worker thread once a pooled connection is free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+async def fetch_all(query, params=None):
+    """Run a query on a pooled connection and return all rows."""
+    return await run_in_pool(_retry_catalog, _fetch_all, query, params)
+
+# catalog data (schemas, tables, columns) rarely changes,
+# so rows of catalog queries are kept for OPENGAUSS_CATALOG_TTL seconds.
+# Keys include LLM supplied table names, so the cache is bounded.
+CATALOG_TTL = float(os.getenv("OPENGAUSS_CATALOG_TTL", "60"))
+CATALOG_CACHE_SIZE = 1024
+_catalog_cache = {}
+# loads in flight by (key, generation),
+# so concurrent misses of a key run the query only once
+_catalog_loading = {}
+# bumped by invalidate_catalog, rows loaded before are not stored
+_catalog_generation = 0
+
+async def fetch_catalog(key, query, params=None):
+    """
+    Like fetch_all, but for catalog queries:
+    rows are cached under key for CATALOG_TTL seconds.
+    """
+    return await load_catalog(key, _fetch_all, query, params)
+
+async def load_catalog(key, func, *args):
+    """
+    Run blocking func(*args) like run_in_pool,
+    its result is cached under key for CATALOG_TTL seconds.
+    """
+    config = get_db_config()
+    key = (key, config["user"], config["dbname"])
+    entry = _catalog_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    # loads started before the last invalidation are not joined
+    loading_key = (key, _catalog_generation)
+    loading = _catalog_loading.get(loading_key)
+    if loading is None:
+        loading = asyncio.ensure_future(_load_catalog(key, func, *args))
+        _catalog_loading[loading_key] = loading
+    # a cancelled caller does not cancel the load shared with others
+    return await asyncio.shield(loading)
+
+async def _load_catalog(key, func, *args):
+    generation = _catalog_generation
+    try:
+        rows = await run_in_pool(_retry_catalog, func, *args)
+    finally:
+        del _catalog_loading[(key, generation)]
+    if generation == _catalog_generation:
+        _store_catalog(key, rows)
+    return rows
+
+def _store_catalog(key, rows):
+    now = time.monotonic()
+    for stale in [k for k, (expires, _) in _catalog_cache.items() if expires <= now]:
+        del _catalog_cache[stale]
+    _catalog_cache.pop(key, None)
+    # oldest entries first, as dicts keep insertion order
+    while len(_catalog_cache) >= CATALOG_CACHE_SIZE:
+        del _catalog_cache[next(iter(_catalog_cache))]
+    _catalog_cache[key] = (now + CATALOG_TTL, rows)
+
+def invalidate_catalog():
+    """Drop all cached catalog rows."""
+    global _catalog_generation
+    _catalog_generation += 1
+    _catalog_cache.clear()
+
+@atexit.register
+def close_pool():
+    """Close all pooled connections on exit."""
+    if _POOL is not None:
+        _POOL.closeall()
+
 # create a FastMCP 2.0 object
 mcp = FastMCP(name="opengauss-fastmcp-server",
               instructions="""
@@ -51,15 +308,9 @@ async def get_schemas() -> str:
     """
     config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                               SELECT nspname AS schema_name 
-                               FROM pg_namespace 
-                               WHERE nspname in ('public', '{}');
-                               """
-                              .format(config["user"]))
-                schemas = cursor.fetchall()
+        schemas = await fetch_catalog("opengauss://schemas",
+                                      EXECUTE_LIST_SCHEMAS,
+                                      (["public", config["user"]],))
         result = ["Schemas in database {}:".format(config["dbname"])]  # Header
         result.extend([sch[0] for sch in schemas])
         return ", ".join(result)
@@ -84,19 +335,125 @@ async def get_tables() -> str:
     """
     config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-               cursor.execute("""SELECT schemaname, tablename 
-                                 FROM pg_tables 
-                                 WHERE schemaname=current_schema();
-                              """)
-               tables = cursor.fetchall()
+        tables = await fetch_catalog("opengauss://tables", EXECUTE_LIST_TABLES)
         result = ["Tables in database {}:".format(config["dbname"])]  # Header
         result.extend([f"{tab[0]}.{tab[1]}" for tab in tables])
         return ", ".join(result)
     except Error as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
+def _fetch_table_definitions():
+    # both queries on one connection, in one read only snapshot
+    with get_conn() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(SQL_READ_ONLY_SNAPSHOT)
+            cursor.execute(EXECUTE_LIST_TABLES)
+            tables = {tab[1] for tab in cursor.fetchall()}
+            # columns of all tables in one query, instead of one query per table,
+            # information_schema.columns also lists views, which are left out
+            cursor.execute(EXECUTE_TABLE_DEFINITIONS)
+            return [col for col in cursor.fetchall() if col[0] in tables]
+
+# called by client, 
+# return definitions of all tables in current schema
+@mcp.resource(
+        uri="opengauss://table_definitions",
+        name="ListTableDefinitions",
+        description="Get definitions of all tables in current schema.",
+        mime_type="text/plain"
+)
+async def get_table_definitions() -> str:
+    """
+    Get definitions of all tables in current schema.
+    """
+    try:
+        coldefs = await load_catalog("opengauss://table_definitions",
+                                     _fetch_table_definitions)
+        result = []
+        for table, cols in groupby(coldefs, key=lambda col: col[0]):
+            result.append(f"Definition of table {table}:")
+            # Header
+            result.append("column_name,data_type,column_default,is_nullable,ordinal_position")
+            result.extend([f"{col[1]},{col[2]},{col[3]},{col[4]},{col[5]}" for col in cols])
+        return "\n".join(result)
+    except Error as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+# rows fetched per round trip by execute_query
+FETCH_SIZE = 1000
+
+# types execute_query keeps in their server text form,
+# instead of parsing them into Decimal, datetime or dict
+# only to convert them back to str for the csv output:
+# NUMERIC, DATE, TIME, TIMETZ, TIMESTAMP, TIMESTAMPTZ, INTERVAL, JSON, JSONB
+# and arrays of them, written in the server's {...} array text form
+TEXT_RESULT_OIDS = (1700, 1082, 1083, 1266, 1114, 1184, 1186, 114, 3802,
+                    1231, 1182, 1183, 1270, 1115, 1185, 1187, 199, 3807)
+TEXT_RESULT = psycopg2.extensions.new_type(TEXT_RESULT_OIDS, "TEXT_RESULT",
+                                           lambda value, cursor: value)
+
+# matched at the start of the query, without copying it
+_SELECT = re.compile(r"\s*select\b", re.IGNORECASE)
+# a statement after a ";", or SELECT ... INTO, cannot run as a server side cursor
+_MORE_STATEMENTS = re.compile(r";\s*\S")
+_INTO = re.compile(r"\binto\b", re.IGNORECASE)
+# a trailing LIMIT n, results known to fit in one fetch
+_LIMIT = re.compile(r"\blimit\s+(\d+)\s*;?\s*\Z", re.IGNORECASE)
+
+def _is_plain_select(query):
+    """
+    Check query is a single SELECT without INTO.
+    Conservative: a ";" or "into" inside a literal also answers False,
+    such queries just take the client side cursor path.
+    """
+    return (_SELECT.match(query) is not None
+            and _MORE_STATEMENTS.search(query) is None
+            and _INTO.search(query) is None)
+
+def _has_small_limit(query):
+    """Check query ends with LIMIT n, n rows fitting in one fetch."""
+    limit = _LIMIT.search(query)
+    return limit is not None and int(limit.group(1)) <= FETCH_SIZE
+
+def _rows_to_csv(cursor):
+    rows = cursor.fetchmany(FETCH_SIZE)
+    # description of a server side cursor is set by the first fetch
+    columns = [desc[0] for desc in cursor.description]
+    buf = io.StringIO()
+    # csv quotes values containing commas, quotes or newlines
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+    # a short batch is the last one, no need for another (empty) fetch
+    while len(rows) == FETCH_SIZE:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        writer.writerows(rows)
+    return buf.getvalue()
+
+def _execute_query(query):
+    # the query may change session state, e.g. SET search_path or SET ROLE
+    with get_conn(reset=True) as conn:
+        # Single SELECT queries,
+        # read through a server side cursor FETCH_SIZE rows at a time,
+        # so the whole result set is never held as rows in memory.
+        # A small LIMIT needs no cursor, saving its DECLARE and CLOSE.
+        if _is_plain_select(query) and not _has_small_limit(query):
+            with conn.cursor(name="execute_query") as cursor:
+                psycopg2.extensions.register_type(TEXT_RESULT, cursor)
+                cursor.execute(query)
+                return _rows_to_csv(cursor), False
+        # Other statements
+        with conn.cursor() as cursor:
+            psycopg2.extensions.register_type(TEXT_RESULT, cursor)
+            cursor.execute(query)
+            # description is set iff the statement returned rows,
+            # e.g. WITH ... SELECT, SHOW, EXPLAIN, ... RETURNING
+            if cursor.description is not None:
+                return _rows_to_csv(cursor), False
+            conn.commit()
+            # DDL may have changed the catalog
+            return f"Query executed successfully. Rows affected: {cursor.rowcount}", True
+
 # call by LLM,
 # return result of any SQL command
 @mcp.tool()
@@ -106,24 +463,15 @@ async def execute_query(query: str) -> str:
     Args:
         query: SQL command
     """
-    config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                # Execute regular SQL queries
-                cursor.execute(query)
-                # Regular SELECT queries
-                if query.strip().upper().startswith("SELECT"):
-                    columns = [desc[0] for desc in cursor.description]
-                    rows = cursor.fetchall()
-                    result = [",".join(map(str, row)) for row in rows]
-                    return "\n".join([",".join(columns)] + result)
-                # Non-SELECT queries
-                else:
-                    conn.commit()
-                    return f"Query executed successfully. Rows affected: {cursor.rowcount}"
+        result, catalog_changed = await run_in_pool(_execute_query, query)
+        # invalidated here, as the catalog cache belongs to the event loop thread
+        if catalog_changed:
+            invalidate_catalog()
+        return result
     except Error as e:
-        logger.error(f"Error executing SQL '{query}': {e}")
+        # formatted by logging only if the record is emitted
+        logger.error("Error executing SQL '%s': %s", query, e)
         return f"Error executing query: {str(e)}"
 
 # call by LLM,
@@ -133,14 +481,11 @@ async def list_tables_in_current_schema() -> str:
     """
         List table names in current schema on the openGauss server.
     """
-    config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-               cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = current_schema();")
-               tables = cursor.fetchall()
+        # same rows as resource opengauss://tables, shared in the catalog cache
+        tables = await fetch_catalog("opengauss://tables", EXECUTE_LIST_TABLES)
         result = ["Tables in current schema:"]  # Header
-        result.extend([tab[0] for tab in tables])
+        result.extend([tab[1] for tab in tables])
         return "\n".join(result)
     except Error as e:
         raise RuntimeError(f"Database error: {str(e)}")
@@ -152,27 +497,16 @@ async def get_table_definition(table: str, sch: str) -> str:
     """
          Get table definition.
     """
-    config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                                  SELECT column_name, 
-                                         data_type, 
-                                         column_default, 
-                                         is_nullable, 
-                                         ordinal_position
-                                  FROM information_schema.columns
-                                  WHERE table_name = '{}' and 
-                                        table_schema='{}';
-                               """
-                               .format(table, sch));
-                coldefs = cursor.fetchall()
-                result = [f"Definition of table {table}:"]
-                # Header
-                result.extend(["column_name,data_type,column_default,is_nullable,ordinal_position"])
-                result.extend([f"{col[0]},{col[1]},{col[2]},{col[3]},{col[4]}" for col in coldefs])
-                return "\n".join(result)
+        # table and sch come from the LLM, so they are bound as parameters
+        coldefs = await fetch_catalog(("get_table_definition", table, sch),
+                                      EXECUTE_TABLE_DEFINITION,
+                                      (table, sch))
+        result = [f"Definition of table {table}:"]
+        # Header
+        result.extend(["column_name,data_type,column_default,is_nullable,ordinal_position"])
+        result.extend([f"{col[0]},{col[1]},{col[2]},{col[3]},{col[4]}" for col in coldefs])
+        return "\n".join(result)
     except Error as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
@@ -183,16 +517,59 @@ async def get_current_user_and_schema() -> str:
     """
          Get current schema and current user.
     """
-    config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("select current_user, current_schema;");
-                rowdata = cursor.fetchone()
-                return "current user is {}, current schema is {}".format(rowdata[0], rowdata[1])
+        rowdata = (await fetch_all(EXECUTE_CURRENT_USER_AND_SCHEMA))[0]
+        return "current user is {}, current schema is {}".format(rowdata[0], rowdata[1])
     except Error as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
+# call by LLM,
+# drop cached schemas, tables and table definitions
+@mcp.tool()
+async def invalidate_catalog_cache() -> str:
+    """
+         Refresh schemas, tables and table definitions on next request.
+    """
+    invalidate_catalog()
+    return "Catalog cache invalidated."
+
+# seconds an idle HTTP connection is kept open
+KEEP_ALIVE_TIMEOUT = 120
+
+# headers keeping proxies (nginx, Cloudflare, ...) from buffering,
+# caching or closing event streams, which would force clients
+# to reconnect. Idle streams are kept alive by the
+# ": ping" comment frame sse-starlette sends every 15 seconds.
+SSE_HEADERS = [
+    (b"cache-control", b"no-cache, no-transform"),
+    (b"x-accel-buffering", b"no"),
+    (b"connection", b"keep-alive"),
+    (b"keep-alive", f"timeout={KEEP_ALIVE_TIMEOUT}".encode()),
+]
+
+class SSEHeadersMiddleware:
+    """ASGI middleware setting SSE_HEADERS on text/event-stream responses."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if any(name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                       for name, value in headers):
+                    names = {name for name, _ in SSE_HEADERS}
+                    headers = [(name, value) for name, value in headers
+                               if name.lower() not in names]
+                    message["headers"] = headers + SSE_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
 def main():
     # command line parameters passed to mcp server on starting it.
     parser = argparse.ArgumentParser(description="openGauss MCP server")
@@ -228,7 +605,7 @@ def main():
         "--log_level",
         type=str,
         choices=["debug", "info", "warning", "error", "critical"],
-        default="debug",
+        default="info",
         help="Log level of mcp server internal code",
     )
     args = parser.parse_args()
@@ -242,7 +619,9 @@ def main():
             host=args.host,
             port=args.port,
             log_level=args.log_level,
-            path=args.path
+            path=args.path,
+            middleware=[Middleware(SSEHeadersMiddleware)],
+            uvicorn_config={"timeout_keep_alive": KEEP_ALIVE_TIMEOUT},
         )
 
 if __name__ == "__main__":